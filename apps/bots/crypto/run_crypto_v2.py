@@ -26,6 +26,12 @@ from coinbase.rest import RESTClient
 import pandas as pd
 import numpy as np
 
+# libyaml's C loader when PyYAML was built against it, else the pure-Python one
+try:
+    from yaml import CSafeLoader as YamlSafeLoader
+except ImportError:
+    from yaml import SafeLoader as YamlSafeLoader
+
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
@@ -181,7 +187,7 @@ class CryptoBotV2:
     def _load_config(self, path: str) -> Dict:
         try:
             with open(path) as f:
-                cfg = yaml.safe_load(f)
+                cfg = yaml.load(f, Loader=YamlSafeLoader)
             logger.info(f"Configuration loaded from {path}")
             return cfg
         except Exception as e:
@@ -13,6 +13,12 @@ from typing import Dict, Any, Optional
 import structlog
 from quantshift_core.notifications import EmailService
 
+# libyaml's C loader when PyYAML was built against it, else the pure-Python one
+try:
+    from yaml import CSafeLoader as YamlSafeLoader
+except ImportError:
+    from yaml import SafeLoader as YamlSafeLoader
+
 logger = structlog.get_logger()
 
 
@@ -33,7 +39,7 @@ class BotEmailNotifier:
         # Load email configuration
         try:
             with open(config_path, 'r') as f:
-                self.config = yaml.safe_load(f)
+                self.config = yaml.load(f, Loader=YamlSafeLoader)
         except Exception as e:
             logger.warning(f"Failed to load email config: {e}")
             self.config = {'email': {'enabled': False}}
@@ -7,10 +7,13 @@ Fetches real account data, positions, and trades from Alpaca API
 import os
 import sys
 import time
+import heapq
 import signal
+import threading
 import logging
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from decimal import Decimal
+from typing import Optional
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -30,6 +33,7 @@ from database_writer import DatabaseWriter
 from alpaca.trading.client import TradingClient
 from alpaca.trading.requests import GetOrdersRequest
 from alpaca.trading.enums import OrderSide, OrderStatus
+from alpaca.common.enums import Sort
 
 # Configure logging
 logging.basicConfig(
@@ -38,11 +42,23 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Look-back window for the Alpaca order sync
+_ONE_DAY = timedelta(days=1)
+
+# Closed orders requested from Alpaca per page during trade sync
+_ORDER_PAGE_SIZE = 100
+
+# Alpaca's after= is exclusive; the cursor sits this far before an open order
+# so the order is still returned once it closes
+_CURSOR_EPSILON = timedelta(microseconds=1)
+
 class QuantShiftEquityBot:
     def __init__(self):
         self.bot_name = "equity-bot"
         self.state_manager = StateManager(bot_name=self.bot_name)
+        self.db = get_db()
         self.running = True
+        self._wakeup = threading.Event()
         
         # Initialize Alpaca client
         self.alpaca_client = TradingClient(
@@ -63,10 +79,16 @@ class QuantShiftEquityBot:
         # Trading cost assumptions for live trading simulation
         self.commission_per_trade = 0.0  # Alpaca has zero commissions
         self.slippage_bps = 5  # 5 basis points (0.05%) slippage estimate
+        self._slippage_mult = self.slippage_bps * 1e-4
         self.expected_live_capital = 10000.00  # Expected starting capital for live trading
         
-        # Track last processed order to avoid duplicates
-        self.last_processed_order_id = None
+        # Metadata fields shared by every synced trade
+        self._trade_metadata_base = {'paper_trading': True}
+        
+        # Sync cursor persisted in Redis so the next sync (even after a
+        # restart) only asks Alpaca for orders created after it
+        cursor = self.state_manager.load_cursor('orders_created_at')
+        self.last_processed_created_at = datetime.fromisoformat(cursor) if cursor else None
         
         # Set up signal handlers for graceful shutdown
         signal.signal(signal.SIGINT, self.handle_shutdown)
@@ -79,9 +101,10 @@ class QuantShiftEquityBot:
     def handle_shutdown(self, signum, frame):
         """Handle graceful shutdown"""
         logger.info(f"Received signal {signum}, shutting down gracefully...")
+        # Only flag the loop here; run() closes the database once the current
+        # job finishes, never from inside the handler
         self.running = False
-        if self.db_writer:
-            self.db_writer.disconnect()
+        self._wakeup.set()
         
     def get_account_info(self):
         """Fetch real account information from Alpaca"""
@@ -119,9 +142,11 @@ class QuantShiftEquityBot:
                     'side': pos.side
                 }
                 position_list.append(position_data)
-                
-                # Save position to Redis for quick recovery
-                self.state_manager.save_position(pos.symbol, position_data)
+            
+            # Save positions to Redis for quick recovery, in one round trip
+            self.state_manager.save_positions_bulk(
+                {position['symbol']: position for position in position_list}
+            )
                 
             return position_list
         except Exception as e:
@@ -131,79 +156,107 @@ class QuantShiftEquityBot:
     def get_total_trades_count(self):
         """Get total number of trades from database"""
         try:
-            db = next(get_db())
-            count = db.query(Trade).filter(Trade.bot_name == self.bot_name).count()
-            db.close()
-            return count
+            with self.db.session() as db:
+                return db.query(Trade).filter(Trade.bot_name == self.bot_name).count()
         except Exception as e:
             logger.error(f"Error getting trades count: {e}")
             return 0
             
+    def _oldest_open_order_created_at(self) -> Optional[datetime]:
+        """Creation time of the oldest order that has not closed yet, if any"""
+        request = GetOrdersRequest(status='open', limit=1, direction=Sort.ASC)
+        open_orders = self.alpaca_client.get_orders(filter=request)
+        return open_orders[0].created_at if open_orders else None
+    
     def sync_trades_to_database(self):
         """Sync recent trades from Alpaca to PostgreSQL"""
         try:
-            # Get closed orders from last 24 hours (includes filled orders)
-            request = GetOrdersRequest(
-                status='closed',
-                limit=100,
-                after=datetime.utcnow() - timedelta(days=1)
-            )
-            orders = self.alpaca_client.get_orders(filter=request)
+            # Get closed orders (includes filled orders) created after the sync
+            # cursor, looking back at most 24 hours, oldest first page by page
+            after = datetime.now(timezone.utc) - _ONE_DAY
+            if self.last_processed_created_at and self.last_processed_created_at > after:
+                after = self.last_processed_created_at
             
-            db = next(get_db())
-            new_trades = 0
+            # Checked before the closed orders so an order filling in between
+            # is either returned below or still counted as open here
+            oldest_open = self._oldest_open_order_created_at()
             
-            for order in orders:
-                # Skip if already processed
-                if order.id == self.last_processed_order_id:
+            orders = []
+            while True:
+                request = GetOrdersRequest(
+                    status='closed',
+                    limit=_ORDER_PAGE_SIZE,
+                    after=after,
+                    direction=Sort.ASC
+                )
+                page = self.alpaca_client.get_orders(filter=request)
+                orders.extend(page)
+                
+                # A short page is the last one; a page that doesn't move the
+                # cursor (all orders share a timestamp) would repeat forever
+                if len(page) < _ORDER_PAGE_SIZE or page[-1].created_at <= after:
                     break
-                    
-                # Calculate realistic costs for live trading
-                fill_price = float(order.filled_avg_price) if order.filled_avg_price else float(order.limit_price or 0)
-                quantity = float(order.filled_qty)
+                after = page[-1].created_at
+            
+            new_trades = 0
+            with self.db.session() as db:
+                # Look up already-synced orders in one query instead of one per order
+                order_ids = [order.id for order in orders]
+                existing_order_ids = {
+                    row[0] for row in db.query(Trade.order_id).filter(Trade.order_id.in_(order_ids))
+                } if order_ids else set()
+
+                for order in orders:
+                    # Calculate realistic costs for live trading
+                    filled_avg_price = order.filled_avg_price
+                    fill_price = float(filled_avg_price) if filled_avg_price else float(order.limit_price or 0)
+                    quantity = float(order.filled_qty)
+                    total_value = fill_price * quantity
                 
-                # Add slippage cost estimate
-                slippage_cost = fill_price * quantity * (self.slippage_bps / 10000)
-                total_value = fill_price * quantity
+                    # Add slippage cost estimate
+                    slippage_cost = total_value * self._slippage_mult
                 
-                # Check if trade already exists
-                existing = db.query(Trade).filter(Trade.order_id == order.id).first()
-                if existing:
-                    continue
+                    # Check if trade already exists
+                    if order.id in existing_order_ids:
+                        continue
                 
-                # Create trade record
-                trade = Trade(
-                    bot_name=self.bot_name,
-                    symbol=order.symbol,
-                    side=order.side.value,
-                    quantity=quantity,
-                    price=fill_price,
-                    total_value=total_value,
-                    commission=self.commission_per_trade,
-                    order_id=order.id,
-                    status=order.status.value,
-                    timestamp=order.filled_at or order.created_at,
-                    metadata={
-                        'order_type': order.type.value,
-                        'time_in_force': order.time_in_force.value,
-                        'estimated_slippage': slippage_cost,
-                        'paper_trading': True
-                    }
-                )
+                    # Create trade record
+                    trade = Trade(
+                        bot_name=self.bot_name,
+                        symbol=order.symbol,
+                        side=order.side.value,
+                        quantity=quantity,
+                        price=fill_price,
+                        total_value=total_value,
+                        commission=self.commission_per_trade,
+                        order_id=order.id,
+                        status=order.status.value,
+                        timestamp=order.filled_at or order.created_at,
+                        metadata={
+                            **self._trade_metadata_base,
+                            'order_type': order.type.value,
+                            'time_in_force': order.time_in_force.value,
+                            'estimated_slippage': slippage_cost,
+                        }
+                    )
                 
-                db.add(trade)
-                new_trades += 1
-                logger.info(f"Synced trade: {order.side.value} {quantity} {order.symbol} @ ${fill_price:.2f}")
+                    db.add(trade)
+                    new_trades += 1
+                    logger.info(f"Synced trade: {order.side.value} {quantity} {order.symbol} @ ${fill_price:.2f}")
+            
+                if new_trades > 0:
+                    logger.info(f"Synced {new_trades} new trades to database")
+            
+            # Advance the cursor past the newest order seen, but never past an
+            # order that is still open: it can fill after newer orders closed
+            # (bracket and stop exit legs) and must be fetched again then
+            cursor = max([after] + [order.created_at for order in orders])
+            if oldest_open is not None:
+                cursor = min(cursor, oldest_open - _CURSOR_EPSILON)
+            if cursor != self.last_processed_created_at:
+                self.last_processed_created_at = cursor
+                self.state_manager.save_cursor('orders_created_at', cursor.isoformat())
             
-            if new_trades > 0:
-                db.commit()
-                logger.info(f"Synced {new_trades} new trades to database")
-                
-            # Update last processed order
-            if orders:
-                self.last_processed_order_id = orders[0].id
-                
-            db.close()
             return new_trades
             
         except Exception as e:
@@ -224,7 +277,6 @@ class QuantShiftEquityBot:
                 state = {
                     'status': 'running',
                     'mode': 'paper',
-                    'last_update': datetime.utcnow().isoformat(),
                     'strategy': 'multi-strategy',
                     'account_balance': account_info['balance'],
                     'equity': account_info['equity'],
@@ -258,7 +310,6 @@ class QuantShiftEquityBot:
                 state = {
                     'status': 'running',
                     'mode': 'paper',
-                    'last_update': datetime.utcnow().isoformat(),
                     'strategy': 'multi-strategy',
                     'account_balance': self.expected_live_capital,
                     'positions_count': 0,
@@ -285,38 +336,34 @@ class QuantShiftEquityBot:
         heartbeat_interval = 30  # seconds
         state_update_interval = 60  # seconds
         trade_sync_interval = 300  # 5 minutes
-        last_heartbeat = time.time()
-        last_state_update = time.time()
-        last_trade_sync = time.time()
+        
+        # Min-heap of (deadline, name, interval, job) - the loop sleeps until the
+        # earliest deadline instead of waking every second to poll them all.
+        # Names are unique so ties on deadline never compare the callables.
+        now = time.monotonic()
+        schedule = [
+            (now + heartbeat_interval, 'heartbeat', heartbeat_interval, self.send_heartbeat),
+            (now + state_update_interval, 'state', state_update_interval, self.update_state),
+            (now + trade_sync_interval, 'trade_sync', trade_sync_interval, self.sync_trades_to_database),
+        ]
+        heapq.heapify(schedule)
         
         while self.running:
+            deadline, name, interval, job = schedule[0]
+            
+            # Sleep until the next job is due; handle_shutdown() sets the
+            # wakeup event so a signal ends the wait immediately
+            now = time.monotonic()
+            if deadline > now:
+                self._wakeup.wait(deadline - now)
+                continue
+            
+            heapq.heapreplace(schedule, (now + interval, name, interval, job))
             try:
-                current_time = time.time()
-                
-                # Send heartbeat
-                if current_time - last_heartbeat >= heartbeat_interval:
-                    self.send_heartbeat()
-                    last_heartbeat = current_time
-                    logger.debug("Heartbeat sent")
-                
-                # Update state with real Alpaca data
-                if current_time - last_state_update >= state_update_interval:
-                    self.update_state()
-                    last_state_update = current_time
-                
-                # Sync trades to database
-                if current_time - last_trade_sync >= trade_sync_interval:
-                    new_trades = self.sync_trades_to_database()
-                    last_trade_sync = current_time
-                    if new_trades > 0:
-                        logger.info(f"Synced {new_trades} new trades")
-                
-                # Sleep to avoid busy waiting
-                time.sleep(1)
-                
+                job()
             except Exception as e:
                 logger.error(f"Error in main loop: {e}", exc_info=True)
-                time.sleep(5)
+                self._wakeup.wait(5)
         
         # Cleanup
         if self.db_writer:
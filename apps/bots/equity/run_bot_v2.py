@@ -7,14 +7,30 @@ This version uses the new broker-agnostic strategy framework:
 - AlpacaExecutor handles Alpaca-specific execution
 - Same strategy code can be used for backtesting and live trading
 """
+import io
 import os
 import sys
+import csv
 import time
+import heapq
+import functools
 import signal
+import threading
 import logging
 import yaml
+import numpy as np
+import pandas as pd
+from psycopg2.extras import execute_values
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone, timedelta
 from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional
+
+# libyaml's C loader when PyYAML was built against it, else the pure-Python one
+try:
+    from yaml import CSafeLoader as YamlSafeLoader
+except ImportError:
+    from yaml import SafeLoader as YamlSafeLoader
 
 # Add the core package to the path
 sys.path.insert(0, '/opt/quantshift/packages/core/src')
@@ -22,7 +38,7 @@ sys.path.insert(0, '/opt/quantshift/packages/core/src')
 from quantshift_core.state_manager import StateManager
 from quantshift_core.database import get_db
 from quantshift_core.models import Trade
-from quantshift_core.strategies import BollingerBounce, RSIMeanReversion
+from quantshift_core.strategies import BollingerBounce, RSIMeanReversion, Account, Position
 from quantshift_core.strategy_orchestrator import StrategyOrchestrator
 
 # Admin platform integration
@@ -32,6 +48,7 @@ from database_writer import DatabaseWriter
 from alpaca.trading.client import TradingClient
 from alpaca.trading.requests import GetOrdersRequest
 from alpaca.trading.enums import QueryOrderStatus
+from alpaca.common.enums import Sort
 from alpaca.data.historical import StockHistoricalDataClient
 
 # Import our Alpaca executor
@@ -44,6 +61,81 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Look-back window for the Alpaca order sync
+_ONE_DAY = timedelta(days=1)
+
+# Closed orders requested from Alpaca per page during trade sync
+_ORDER_PAGE_SIZE = 100
+
+# Alpaca's after= is exclusive; the cursor sits this far before an open order
+# so the order is still returned once it closes
+_CURSOR_EPSILON = timedelta(microseconds=1)
+
+# Trade-sync batches larger than this are loaded with COPY instead of INSERT
+_COPY_THRESHOLD = 50
+
+# How long an account/positions snapshot is reused across jobs (seconds)
+_SNAPSHOT_TTL = 5.0
+
+
+# Executor order sides mapped to trades.side and the recorded signal type
+_ORDER_SIDES = {'BUY': 'BUY', 'LONG': 'BUY', 'SELL': 'SELL', 'SHORT': 'SELL'}
+
+
+def _coalesce_columns(df: pd.DataFrame, names, default) -> pd.Series:
+    """First non-null value across the named columns, like chained dict.get()."""
+    result = pd.Series(default, index=df.index)
+    for name in reversed(names):
+        if name in df:
+            result = df[name].where(df[name].notna(), result)
+    return result
+
+
+def _trade_entries_from_orders(orders, strategy_name: str) -> list:
+    """
+    Turn executed-order dicts into record_trade_entries_batch entries.
+    
+    Columns are coerced in one vectorized pass. Orders that are not buys or
+    sells are ignored; those with no symbol or a missing/unparseable quantity
+    or price are dropped with a warning.
+    """
+    df = pd.DataFrame(orders)
+    side = _coalesce_columns(df, ['side'], 'BUY').astype(str).str.upper().map(_ORDER_SIDES)
+    symbol = _coalesce_columns(df, ['symbol'], '').astype(str)
+    quantity = pd.to_numeric(_coalesce_columns(df, ['quantity', 'qty'], 0), errors='coerce')
+    price = pd.to_numeric(_coalesce_columns(df, ['fill_price', 'price'], 0), errors='coerce')
+    reason = _coalesce_columns(df, ['reason'], '')
+    
+    valid = side.notna() & symbol.ne('') & quantity.notna() & price.fillna(0).ne(0)
+    skipped = int((side.notna() & ~valid).sum())
+    if skipped:
+        logger.warning(f"Could not record {skipped} executed order(s) to DB")
+    
+    return [
+        {
+            'symbol': row.symbol,
+            'side': row.side,
+            'quantity': float(row.quantity),
+            'entry_price': float(row.price),
+            'strategy': strategy_name,
+            'signal_type': f"{row.side.lower()}_signal",
+            'entry_reason': row.reason,
+            'entered_at': datetime.now(),
+        }
+        for row in pd.DataFrame({
+            'symbol': symbol, 'side': side, 'quantity': quantity,
+            'price': price, 'reason': reason,
+        })[valid].itertuples(index=False)
+    ]
+
+
+class AccountSnapshot(NamedTuple):
+    """Account and positions fetched together, with positions pre-serialized and P&L pre-summed."""
+    account: Account
+    positions: List[Position]
+    position_dicts: Dict[str, Dict[str, Any]]
+    total_unrealized_pl: float
+
 
 class QuantShiftEquityBotV2:
     """
@@ -55,10 +147,19 @@ class QuantShiftEquityBotV2:
         self.bot_name = "equity-bot"
         self.state_manager = StateManager(bot_name=self.bot_name)
         self.running = True
+        self._wakeup = threading.Event()
         
         # Load configuration
         self.config = self._load_config(config_path)
         
+        # Resolve settings read on every cycle once, instead of re-walking
+        # the nested config dicts each time
+        strategy_config = self.config.get('strategy', {})
+        self._symbols = strategy_config.get('symbols', ['SPY'])
+        self._strategy_enabled = strategy_config.get('enabled', True)
+        self._strategy_interval = strategy_config.get('schedule', {}).get('check_interval', 300)
+        self._paper_enabled = self.config.get('paper_trading', {}).get('enabled', True)
+        
         # Initialize Alpaca clients
         self.alpaca_client = TradingClient(
             api_key=os.getenv('APCA_API_KEY_ID'),
@@ -110,24 +211,51 @@ class QuantShiftEquityBotV2:
         )
         
         # Initialize Alpaca executor
-        symbols = self.config.get('strategy', {}).get('symbols', ['SPY'])
-        
         risk_config = self.config.get('risk_management', {})
         self.executor = AlpacaExecutor(
             strategy=self.strategy,
             alpaca_client=self.alpaca_client,
             data_client=self.data_client,
-            symbols=symbols,
+            symbols=self._symbols,
             simulated_capital=None,  # Use real Alpaca paper account equity for position sizing
             risk_config=risk_config
         )
         
+        # Account and positions are independent REST calls; fetch them side by side
+        self._io_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix='alpaca-io')
+        
+        # Heartbeat and state updates often land within seconds of each other;
+        # they share one snapshot instead of each calling Alpaca
+        self._snapshot = None
+        self._snapshot_at = 0.0
+        self._snapshot_lock = threading.Lock()
+        
+        # The DB heartbeat and trade sync run here so the main loop never
+        # blocks on PostgreSQL; one worker keeps them from overlapping each
+        # other. Names of jobs queued or running, so a stuck database can't
+        # pile up more than one job of each kind
+        self._db_worker = ThreadPoolExecutor(max_workers=1, thread_name_prefix='db-writer')
+        self._background_jobs = set()
+        self._background_jobs_lock = threading.Lock()
+        # The worker and the main loop (trade flushes) can both reconnect
+        self._db_connect_lock = threading.Lock()
+        
+        # Sync cursor persisted in Redis so the next sync (even after a
+        # restart) only asks Alpaca for orders created after it
+        cursor = self.state_manager.load_cursor('orders_created_at')
+        self.last_processed_created_at = datetime.fromisoformat(cursor) if cursor else None
+        
         # Trading cost assumptions
         self.commission_per_trade = 0.0
         self.slippage_bps = self.config.get('execution', {}).get('costs', {}).get('slippage_bps', 5)
         
-        # Track last processed order
-        self.last_processed_order_id = None
+        # Running total of this bot's trades rows, counted once and then kept
+        # current by the writers below instead of a COUNT(*) per heartbeat
+        self.trades_count = None
+        self._trades_count_lock = threading.Lock()
+        
+        # Executed orders not yet written to the trades table (main thread only)
+        self._pending_trades = []
         
         # Initialize database writer for admin platform heartbeats
         self.db_writer = DatabaseWriter(bot_name=self.bot_name)
@@ -144,7 +272,7 @@ class QuantShiftEquityBotV2:
         
         logger.info(f"Initialized {self.bot_name} V2 with broker-agnostic architecture")
         logger.info(f"Strategy: {self.strategy.name}")
-        logger.info(f"Symbols: {symbols}")
+        logger.info(f"Symbols: {self._symbols}")
         logger.info(f"Paper Trading: Enabled")
         
         # Seed bot_config table so dashboard shows strategy name
@@ -155,43 +283,39 @@ class QuantShiftEquityBotV2:
         if not self.db_writer:
             return
         try:
-            cursor = self.db_writer.conn.cursor()
-            symbols = self.config.get('strategy', {}).get('symbols', ['SPY', 'QQQ'])
-            import uuid as _uuid
-            cursor.execute("""
-                INSERT INTO bot_config (
-                    id, name, strategy, symbols, enabled, paper_trading,
-                    risk_per_trade, max_position_size, max_portfolio_heat,
-                    created_at, updated_at
-                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, NOW(), NOW())
-                ON CONFLICT (name) DO UPDATE SET
-                    strategy = EXCLUDED.strategy,
-                    updated_at = NOW()
-            """, (
-                str(_uuid.uuid4()),
-                self.bot_name,
-                self.strategy.name,
-                symbols,
-                True,
-                True,
-                self.config.get('risk_management', {}).get('risk_per_trade', 0.01),
-                self.config.get('risk_management', {}).get('max_position_size', 0.20),
-                self.config.get('risk_management', {}).get('max_portfolio_heat', 0.10),
-            ))
-            self.db_writer.conn.commit()
+            with self.db_writer.connection() as conn:
+                cursor = conn.cursor()
+                symbols = self.config.get('strategy', {}).get('symbols', ['SPY', 'QQQ'])
+                import uuid as _uuid
+                cursor.execute("""
+                    INSERT INTO bot_config (
+                        id, name, strategy, symbols, enabled, paper_trading,
+                        risk_per_trade, max_position_size, max_portfolio_heat,
+                        created_at, updated_at
+                    ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, NOW(), NOW())
+                    ON CONFLICT (name) DO UPDATE SET
+                        strategy = EXCLUDED.strategy,
+                        updated_at = NOW()
+                """, (
+                    str(_uuid.uuid4()),
+                    self.bot_name,
+                    self.strategy.name,
+                    symbols,
+                    True,
+                    True,
+                    self.config.get('risk_management', {}).get('risk_per_trade', 0.01),
+                    self.config.get('risk_management', {}).get('max_position_size', 0.20),
+                    self.config.get('risk_management', {}).get('max_portfolio_heat', 0.10),
+                ))
             logger.info(f"Bot config seeded: strategy={self.strategy.name}")
         except Exception as e:
             logger.warning(f"Could not seed bot_config: {e}")
-            try:
-                self.db_writer.conn.rollback()
-            except Exception:
-                pass
 
     def _load_config(self, config_path: str) -> dict:
         """Load configuration from YAML file."""
         try:
             with open(config_path, 'r') as f:
-                config = yaml.safe_load(f)
+                config = yaml.load(f, Loader=YamlSafeLoader)
             logger.info(f"Configuration loaded from {config_path}")
             return config
         except Exception as e:
@@ -226,21 +350,22 @@ class QuantShiftEquityBotV2:
     def handle_shutdown(self, signum, frame):
         """Handle graceful shutdown."""
         logger.info(f"Received signal {signum}, shutting down gracefully...")
+        # Only flag the loop here; run() drains pending writes and closes the
+        # pool once the current job finishes, never from inside the handler
         self.running = False
-        if self.db_writer:
-            self.db_writer.disconnect()
+        self._wakeup.set()
     
     def _ensure_db_connection(self):
         """Ensure db_writer connection is alive, reconnect if needed."""
         if not self.db_writer:
             return False
-        try:
-            # Test connection with a simple query
-            cursor = self.db_writer.conn.cursor()
-            cursor.execute('SELECT 1')
-            cursor.fetchone()
+        # The pool discards connections psycopg2 has marked closed, so only a
+        # missing or shut-down pool needs reconnecting
+        if self.db_writer.connected:
             return True
-        except Exception:
+        with self._db_connect_lock:
+            if self.db_writer.connected:
+                return True
             try:
                 self.db_writer.connect()
                 return True
@@ -248,92 +373,171 @@ class QuantShiftEquityBotV2:
                 logger.warning(f"Could not reconnect to database: {e}")
                 return False
 
+    def _oldest_open_order_created_at(self) -> Optional[datetime]:
+        """Creation time of the oldest order that has not closed yet, if any."""
+        request = GetOrdersRequest(status=QueryOrderStatus.OPEN, limit=1, direction=Sort.ASC)
+        open_orders = self.alpaca_client.get_orders(filter=request)
+        return open_orders[0].created_at if open_orders else None
+    
     def sync_trades_to_database(self):
         """Sync recent trades from Alpaca to PostgreSQL via db_writer connection."""
         if not self.db_writer or not self._ensure_db_connection():
             return 0
         try:
-            # Get orders from last 24 hours
-            request = GetOrdersRequest(
-                status=QueryOrderStatus.CLOSED,
-                limit=100,
-                after=datetime.now(timezone.utc) - timedelta(days=1)
-            )
-            orders = self.alpaca_client.get_orders(filter=request)
+            # Page through closed orders created after the sync cursor (at
+            # most 24 hours back), oldest first
+            after = datetime.now(timezone.utc) - _ONE_DAY
+            if self.last_processed_created_at and self.last_processed_created_at > after:
+                after = self.last_processed_created_at
             
-            new_trades = 0
-            cursor = self.db_writer.conn.cursor()
+            # Checked before the closed orders so an order filling in between
+            # is either returned below or still counted as open here
+            oldest_open = self._oldest_open_order_created_at()
             
-            for order in orders:
-                # Skip if already processed
-                if order.id == self.last_processed_order_id:
-                    break
-                
-                # Only sync filled orders
-                if not order.filled_avg_price or not order.filled_qty:
-                    continue
-                
-                # Check if trade already exists (no order_id col, use symbol+entered_at)
-                cursor.execute(
-                    'SELECT id FROM trades WHERE bot_name = %s AND symbol = %s AND entered_at = %s',
-                    (self.bot_name, order.symbol, order.filled_at or order.created_at)
+            rows = []
+            newest = after
+            while True:
+                request = GetOrdersRequest(
+                    status=QueryOrderStatus.CLOSED,
+                    limit=_ORDER_PAGE_SIZE,
+                    after=after,
+                    direction=Sort.ASC
                 )
-                if cursor.fetchone():
-                    continue
+                orders = self.alpaca_client.get_orders(filter=request)
                 
-                fill_price = float(order.filled_avg_price)
-                quantity = float(order.filled_qty)
+                for order in orders:
+                    # Only sync filled orders
+                    if not order.filled_avg_price or not order.filled_qty:
+                        continue
+                    
+                    rows.append((
+                        self.bot_name,
+                        order.symbol,
+                        order.side.value.upper(),
+                        float(order.filled_qty),
+                        float(order.filled_avg_price),
+                        'CLOSED',
+                        self.strategy.name,
+                        order.filled_at or order.created_at,
+                    ))
                 
-                cursor.execute("""
-                    INSERT INTO trades (
-                        bot_name, symbol, side, quantity, entry_price,
-                        status, strategy, entered_at, created_at, updated_at
-                    ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, NOW(), NOW())
-                """, (
-                    self.bot_name,
-                    order.symbol,
-                    order.side.value.upper(),
-                    quantity,
-                    fill_price,
-                    'CLOSED',
-                    self.strategy.name,
-                    order.filled_at or order.created_at,
-                ))
-                new_trades += 1
-                logger.info(f"Synced trade: {order.side.value} {quantity} {order.symbol} @ ${fill_price:.2f}")
+                if orders:
+                    newest = max(newest, orders[-1].created_at)
+                # A short page is the last one; a page that doesn't move the
+                # cursor (all orders share a timestamp) would repeat forever
+                if len(orders) < _ORDER_PAGE_SIZE or orders[-1].created_at <= after:
+                    break
+                after = orders[-1].created_at
+            
+            # Orders already synced hit the unique (bot_name, symbol, entered_at)
+            # index and are skipped
+            new_trades = 0
+            if rows:
+                with self.db_writer.connection() as conn:
+                    if len(rows) > _COPY_THRESHOLD:
+                        inserted = self._copy_synced_trades(conn.cursor(), rows)
+                    else:
+                        inserted = execute_values(conn.cursor(), """
+                            INSERT INTO trades (
+                                bot_name, symbol, side, quantity, entry_price,
+                                status, strategy, entered_at, created_at, updated_at
+                            ) VALUES %s
+                            ON CONFLICT (bot_name, symbol, entered_at) DO NOTHING
+                            RETURNING symbol, side, quantity, entry_price
+                        """, rows, template="(%s, %s, %s, %s, %s, %s, %s, %s, NOW(), NOW())",
+                            page_size=100, fetch=True)
+                
+                new_trades = len(inserted)
+                self._add_trades(new_trades)
+                for symbol, side, quantity, fill_price in inserted:
+                    logger.info(f"Synced trade: {side.lower()} {quantity} {symbol} @ ${fill_price:.2f}")
             
             if new_trades > 0:
-                self.db_writer.conn.commit()
                 logger.info(f"Synced {new_trades} new trades to database")
             
-            # Update last processed order
-            if orders:
-                self.last_processed_order_id = orders[0].id
+            # Advance the cursor only once the rows are safely written, and
+            # never past an order that is still open: it can fill after newer
+            # orders closed (bracket and stop exit legs) and must be fetched
+            # again then
+            cursor = newest
+            if oldest_open is not None:
+                cursor = min(cursor, oldest_open - _CURSOR_EPSILON)
+            if cursor != self.last_processed_created_at:
+                self.last_processed_created_at = cursor
+                self.state_manager.save_cursor('orders_created_at', cursor.isoformat())
             
             return new_trades
             
         except Exception as e:
             logger.error(f"Error syncing trades: {e}", exc_info=True)
-            try:
-                self.db_writer.conn.rollback()
-            except Exception:
-                pass
             return 0
     
+    def _copy_synced_trades(self, cursor, rows):
+        """
+        Bulk-load synced trades through COPY into a session staging table.
+        
+        Used when catching up after downtime, where COPY beats a multi-row
+        INSERT. Returns the (symbol, side, quantity, entry_price) rows inserted.
+        """
+        cursor.execute("""
+            CREATE TEMP TABLE IF NOT EXISTS trades_staging (
+                bot_name TEXT, symbol TEXT, side TEXT, quantity DOUBLE PRECISION,
+                entry_price DOUBLE PRECISION, status TEXT, strategy TEXT,
+                entered_at TIMESTAMPTZ
+            ) ON COMMIT DELETE ROWS
+        """)
+        buf = io.StringIO()
+        writer = csv.writer(buf)
+        for row in rows:
+            writer.writerow(value.isoformat() if isinstance(value, datetime) else value for value in row)
+        buf.seek(0)
+        cursor.copy_expert("COPY trades_staging FROM STDIN WITH (FORMAT csv)", buf)
+        cursor.execute("""
+            INSERT INTO trades (
+                bot_name, symbol, side, quantity, entry_price,
+                status, strategy, entered_at, created_at, updated_at
+            )
+            SELECT bot_name, symbol, side, quantity, entry_price,
+                   status, strategy, entered_at, NOW(), NOW()
+            FROM trades_staging
+            ON CONFLICT (bot_name, symbol, entered_at) DO NOTHING
+            RETURNING symbol, side, quantity, entry_price
+        """)
+        return cursor.fetchall()
+    
+    def _fetch_account_and_positions(self):
+        """Fetch account and positions from Alpaca, reusing a snapshot up to _SNAPSHOT_TTL old.
+        
+        The returned snapshot is shared between jobs and must not be mutated.
+        """
+        with self._snapshot_lock:
+            if self._snapshot and time.monotonic() - self._snapshot_at < _SNAPSHOT_TTL:
+                return self._snapshot
+            account_future = self._io_pool.submit(self.executor.get_account)
+            positions_future = self._io_pool.submit(self.executor.get_positions)
+            positions = positions_future.result()
+            self._snapshot = AccountSnapshot(
+                account=account_future.result(),
+                positions=positions,
+                position_dicts={pos.symbol: pos.to_dict() for pos in positions},
+                total_unrealized_pl=float(np.fromiter(
+                    (p.unrealized_pl for p in positions), dtype=np.float64, count=len(positions)
+                ).sum()) if positions else 0.0,
+            )
+            self._snapshot_at = time.monotonic()
+            return self._snapshot
+    
     def update_state(self):
         """Update bot state in Redis."""
         try:
             # Get account and positions
-            account = self.executor.get_account()
-            positions = self.executor.get_positions()
-            
-            # Calculate total unrealized P&L
-            total_unrealized_pl = sum(p.unrealized_pl for p in positions)
+            snapshot = self._fetch_account_and_positions()
+            account, positions = snapshot.account, snapshot.positions
+            total_unrealized_pl = snapshot.total_unrealized_pl
             
             state = {
                 'status': 'running',
                 'mode': 'paper',
-                'last_update': datetime.now(timezone.utc).isoformat(),
                 'strategy': self.strategy.name,
                 'strategy_config': self.strategy.config,
                 'account_balance': account.cash,
@@ -342,15 +546,14 @@ class QuantShiftEquityBotV2:
                 'portfolio_value': account.portfolio_value,
                 'positions_count': len(positions),
                 'unrealized_pl': total_unrealized_pl,
-                'symbols': self.config.get('strategy', {}).get('symbols', []),
+                'symbols': self._symbols,
                 'architecture': 'broker_agnostic_v2'
             }
             
             self.state_manager.save_state(state)
             
-            # Save individual positions
-            for pos in positions:
-                self.state_manager.save_position(pos.symbol, pos.to_dict())
+            # Save individual positions in one Redis round trip
+            self.state_manager.save_positions_bulk(snapshot.position_dicts)
             
             logger.info(
                 f"State updated - Balance: ${account.cash:.2f}, "
@@ -362,49 +565,77 @@ class QuantShiftEquityBotV2:
         except Exception as e:
             logger.error(f"Error updating state: {e}", exc_info=True)
     
+    def _seed_trades_count(self):
+        """Count this bot's trades once; later inserts are added via _add_trades."""
+        try:
+            with self.db_writer.connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute('SELECT COUNT(*) FROM trades WHERE bot_name = %s', (self.bot_name,))
+                count = cursor.fetchone()[0]
+            with self._trades_count_lock:
+                if self.trades_count is None:
+                    self.trades_count = count
+        except Exception as e:
+            logger.warning(f"Could not count trades: {e}")
+    
+    def _add_trades(self, count: int):
+        """Add newly inserted trades rows to the running total."""
+        if not count:
+            return
+        with self._trades_count_lock:
+            if self.trades_count is not None:
+                self.trades_count += count
+    
     def send_heartbeat(self):
-        """Send heartbeat to Redis and PostgreSQL bot_status table."""
+        """Send heartbeat to Redis and PostgreSQL bot_status table.
+        
+        The Redis heartbeat drives failover, so it is written from the main
+        loop where a slow database can't delay it; the DB write is handed to
+        the worker.
+        """
         self.state_manager.heartbeat()
         
         # Also write to DB so the dashboard shows RUNNING
-        if self.db_writer and self._ensure_db_connection():
-            try:
-                account = self.executor.get_account()
-                positions = self.executor.get_positions()
-                trades_count = 0
-                try:
-                    cursor = self.db_writer.conn.cursor()
-                    cursor.execute('SELECT COUNT(*) FROM trades WHERE bot_name = %s', (self.bot_name,))
-                    trades_count = cursor.fetchone()[0]
-                except Exception:
-                    pass
-                pos_dicts = [p.to_dict() for p in positions]
-                self.db_writer.update_status(
-                    account_info={
-                        'equity': account.equity,
-                        'balance': account.cash,
-                        'buying_power': account.buying_power,
-                        'portfolio_value': account.portfolio_value,
-                    },
-                    positions=pos_dicts,
-                    trades_count=trades_count
-                )
-                # Sync live positions to positions table
-                if pos_dicts:
-                    self.db_writer.update_positions(pos_dicts)
-            except Exception as e:
-                logger.warning(f"Could not write DB heartbeat: {e}", exc_info=True)
+        if self.db_writer:
+            self._run_in_background(self._write_db_heartbeat)
+    
+    def _write_db_heartbeat(self):
+        """Write account status and live positions to PostgreSQL."""
+        if not self._ensure_db_connection():
+            return
+        
+        try:
+            snapshot = self._fetch_account_and_positions()
+            account = snapshot.account
+            if self.trades_count is None:
+                self._seed_trades_count()
+            pos_dicts = list(snapshot.position_dicts.values())
+            self.db_writer.update_status(
+                account_info={
+                    'equity': account.equity,
+                    'balance': account.cash,
+                    'buying_power': account.buying_power,
+                    'portfolio_value': account.portfolio_value,
+                },
+                positions=pos_dicts,
+                trades_count=self.trades_count or 0
+            )
+            # Sync live positions to positions table
+            if pos_dicts:
+                self.db_writer.update_positions(pos_dicts)
+        except Exception as e:
+            logger.warning(f"Could not write DB heartbeat: {e}", exc_info=True)
     
     def run_strategy(self):
         """Run strategy cycle to generate and execute signals."""
         try:
             # Check if strategy is enabled
-            if not self.config.get('strategy', {}).get('enabled', True):
+            if not self._strategy_enabled:
                 logger.debug("Strategy execution disabled in config")
                 return
             
             # Check if paper trading is enabled
-            if not self.config.get('paper_trading', {}).get('enabled', True):
+            if not self._paper_enabled:
                 logger.debug("Paper trading disabled in config")
                 return
             
@@ -429,41 +660,63 @@ class QuantShiftEquityBotV2:
                     f"Signal: {signal['type']} {signal['symbol']} @ ${signal['price']:.2f} - {signal['reason']}"
                 )
 
-            # Record executed orders to trades table
-            if results['orders_executed'] and self.db_writer and self._ensure_db_connection():
-                for order in results['orders_executed']:
-                    try:
-                        side = order.get('side', 'BUY')
-                        symbol = order.get('symbol', '')
-                        qty = order.get('quantity', order.get('qty', 0))
-                        price = order.get('fill_price', order.get('price', 0))
-                        reason = order.get('reason', '')
-                        if side.upper() in ('BUY', 'LONG') and symbol and price:
-                            self.db_writer.record_trade_entry(
-                                symbol=symbol,
-                                side='BUY',
-                                quantity=float(qty),
-                                entry_price=float(price),
-                                strategy=self.strategy.name,
-                                signal_type='buy_signal',
-                                entry_reason=reason,
-                            )
-                        elif side.upper() in ('SELL', 'SHORT') and symbol and price:
-                            self.db_writer.record_trade_entry(
-                                symbol=symbol,
-                                side='SELL',
-                                quantity=float(qty),
-                                entry_price=float(price),
-                                strategy=self.strategy.name,
-                                signal_type='sell_signal',
-                                entry_reason=reason,
-                            )
-                    except Exception as te:
-                        logger.warning(f"Could not record trade to DB: {te}")
+            # Orders change the account; don't serve the pre-trade snapshot
+            if results['orders_executed']:
+                with self._snapshot_lock:
+                    self._snapshot = None
+            
+            # Queue executed orders for the trades table
+            if results['orders_executed'] and self.db_writer:
+                self._pending_trades.extend(
+                    _trade_entries_from_orders(results['orders_executed'], self.strategy.name)
+                )
+                self._flush_pending_trades()
 
         except Exception as e:
             logger.error(f"Error in strategy execution: {e}", exc_info=True)
     
+    def _flush_pending_trades(self):
+        """Write queued trade entries in one batch; keep them queued while the DB is unreachable."""
+        if not self._pending_trades or not self._ensure_db_connection():
+            return
+        recorded = self.db_writer.record_trade_entries_batch(self._pending_trades)
+        if recorded is None:
+            logger.warning(f"{len(self._pending_trades)} trade entries queued for retry")
+            return
+        # Rows the server rejected were dropped by the writer; retrying them
+        # would only block the entries queued behind them
+        self._add_trades(recorded)
+        self._pending_trades = []
+    
+    def _drain_and_disconnect(self):
+        """Flush queued trade entries, then close the database pool."""
+        if not self.db_writer:
+            return
+        self._flush_pending_trades()
+        if self._pending_trades:
+            logger.error(f"Dropping {len(self._pending_trades)} unrecorded trade entries at shutdown")
+        self.db_writer.disconnect()
+    
+    def _run_in_background(self, job):
+        """Hand a scheduled job to the DB worker thread, logging any failure.
+        
+        Skipped while a job of the same kind is still queued or running; it
+        would only repeat the same write once the worker catches up.
+        """
+        name = job.__name__
+        with self._background_jobs_lock:
+            if name in self._background_jobs:
+                logger.warning(f"Skipping {name}: previous run has not finished")
+                return
+            self._background_jobs.add(name)
+        
+        def finish(future):
+            with self._background_jobs_lock:
+                self._background_jobs.discard(name)
+            if future.exception():
+                logger.error(f"Error in background job {name}: {future.exception()}")
+        self._db_worker.submit(job).add_done_callback(finish)
+    
     def run(self):
         """Main bot loop."""
         logger.info(f"Starting {self.bot_name} V2...")
@@ -476,44 +729,41 @@ class QuantShiftEquityBotV2:
         heartbeat_interval = 30  # seconds
         state_update_interval = 60  # seconds
         trade_sync_interval = 300  # 5 minutes
-        strategy_interval = self.config.get('strategy', {}).get('schedule', {}).get('check_interval', 300)  # 5 minutes
+        strategy_interval = self._strategy_interval
         
-        last_heartbeat = time.time()
-        last_state_update = time.time()
-        last_trade_sync = time.time()
-        last_strategy_run = time.time()
+        # Min-heap of (deadline, name, interval, job) - the loop sleeps until the
+        # earliest deadline instead of waking every second to poll them all.
+        # Names are unique so ties on deadline never compare the callables.
+        now = time.monotonic()
+        schedule = [
+            (now + heartbeat_interval, 'heartbeat', heartbeat_interval, self.send_heartbeat),
+            (now + state_update_interval, 'state', state_update_interval, self.update_state),
+            (now + trade_sync_interval, 'trade_sync', trade_sync_interval,
+             functools.partial(self._run_in_background, self.sync_trades_to_database)),
+            (now + strategy_interval, 'strategy', strategy_interval, self.run_strategy),
+        ]
+        heapq.heapify(schedule)
         
         while self.running:
+            deadline, name, interval, job = schedule[0]
+            
+            # Sleep until the next job is due; handle_shutdown() sets the
+            # wakeup event so a signal ends the wait immediately
+            now = time.monotonic()
+            if deadline > now:
+                self._wakeup.wait(deadline - now)
+                continue
+            
+            heapq.heapreplace(schedule, (now + interval, name, interval, job))
             try:
-                current_time = time.time()
-                
-                # Send heartbeat
-                if current_time - last_heartbeat >= heartbeat_interval:
-                    self.send_heartbeat()
-                    last_heartbeat = current_time
-                
-                # Update state
-                if current_time - last_state_update >= state_update_interval:
-                    self.update_state()
-                    last_state_update = current_time
-                
-                # Sync trades
-                if current_time - last_trade_sync >= trade_sync_interval:
-                    self.sync_trades_to_database()
-                    last_trade_sync = current_time
-                
-                # Run strategy
-                if current_time - last_strategy_run >= strategy_interval:
-                    self.run_strategy()
-                    last_strategy_run = current_time
-                
-                # Sleep to avoid busy waiting
-                time.sleep(1)
-                
+                job()
             except Exception as e:
                 logger.error(f"Error in main loop: {e}", exc_info=True)
-                time.sleep(5)
+                self._wakeup.wait(5)
         
+        self._db_worker.shutdown(wait=True)
+        self._io_pool.shutdown(wait=True)
+        self._drain_and_disconnect()
         logger.info("Bot stopped")
 
 
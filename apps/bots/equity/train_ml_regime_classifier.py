@@ -6,16 +6,21 @@ This script trains the ML-based regime classifier on historical SPY data.
 Run this monthly to retrain the model with fresh data.
 
 Usage:
-    python train_ml_regime_classifier.py [--days 730]
+    python train_ml_regime_classifier.py [--days 730] [--symbol SPY [QQQ ...]]
+                                         [--cache-dir /opt/quantshift/cache]
 """
 
 import sys
+import math
 import argparse
 from datetime import datetime, timedelta
+from pathlib import Path
 
 sys.path.insert(0, '/opt/quantshift/packages/core/src')
 
 from quantshift_core.ml_regime_classifier import MLRegimeClassifier
+from training_utils import fetch_training_data_multi, model_path_for
+import pandas as pd
 import yfinance as yf
 import logging
 
@@ -25,65 +30,93 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Relative close-price difference on the overlapping bar that marks the cached
+# bars as adjusted differently from Yahoo's current history
+_ADJUSTMENT_TOLERANCE = 1e-6
 
-def fetch_training_data(symbol: str = 'SPY', days: int = 730):
-    """Fetch historical data for training."""
-    logger.info(f"Fetching {days} days of {symbol} data from Yahoo Finance")
-    
+
+def _fetch_history(symbol: str, start, end) -> pd.DataFrame:
+    """Download daily bars from Yahoo Finance with lower-cased column names."""
+    data = yf.Ticker(symbol).history(start=start, end=end)
+    data.columns = [col.lower() for col in data.columns]
+    return data
+
+
+def _as_index_time(data: pd.DataFrame, when: datetime) -> pd.Timestamp:
+    """Convert a naive datetime to the (possibly tz-aware) index's timezone."""
+    ts = pd.Timestamp(when)
+    return ts.tz_localize(data.index.tz) if data.index.tz is not None else ts
+
+
+def fetch_training_data(symbol: str = 'SPY', days: int = 730,
+                        cache_dir: str = '/opt/quantshift/cache'):
+    """
+    Fetch historical data for training.
+    
+    Bars are cached in ``{cache_dir}/{symbol}.parquet``; later runs only
+    download from the last cached bars onward. Falls back to a full download
+    when the cache is missing, too short, unreadable, or no longer matches
+    Yahoo's (dividend/split) adjustment.
+    """
     end_date = datetime.now()
     start_date = end_date - timedelta(days=days)
-    
-    ticker = yf.Ticker(symbol)
-    data = ticker.history(start=start_date, end=end_date)
-    
-    # Normalize column names
-    data.columns = [col.lower() for col in data.columns]
+    cache_path = Path(cache_dir) / f"{symbol}.parquet"
+    
+    cached = None
+    if cache_path.exists():
+        try:
+            cached = pd.read_parquet(cache_path)
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable cache {cache_path}: {e}")
+    
+    data = None
+    # A week of slack covers weekends/holidays at the start of the window
+    if cached is not None and not cached.empty and \
+            cached.index[0] <= _as_index_time(cached, start_date + timedelta(days=7)):
+        # Refetch from the second-to-last cached bar: the last one may be a
+        # partial bar cached during market hours, while the one before it is
+        # final and shows whether Yahoo has since re-adjusted the history
+        overlap = cached.index[-2] if len(cached) > 1 else cached.index[-1]
+        logger.info(f"Fetching {symbol} bars since {overlap.date()} (cached: {len(cached)})")
+        tail = _fetch_history(symbol, overlap.date(), end_date)
+        if overlap in tail.index and not math.isclose(
+                tail.at[overlap, 'close'], cached.at[overlap, 'close'], rel_tol=_ADJUSTMENT_TOLERANCE):
+            # A dividend or split re-adjusted every earlier bar; appending to
+            # the cached ones would leave a price jump at the join
+            logger.warning(f"{symbol} history was re-adjusted since it was cached; refetching")
+        else:
+            data = pd.concat([cached, tail]) if not tail.empty else cached
+            data = data[~data.index.duplicated(keep='last')]
+    
+    if data is None:
+        logger.info(f"Fetching {days} days of {symbol} data from Yahoo Finance")
+        data = _fetch_history(symbol, start_date, end_date)
+    
+    if not data.empty:
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            data.to_parquet(cache_path, compression='zstd')
+        except Exception as e:
+            logger.warning(f"Could not write cache {cache_path}: {e}")
+        data = data[data.index >= _as_index_time(data, start_date)]
     
     logger.info(f"Fetched {len(data)} bars of data")
     
     return data
 
 
-def main():
-    parser = argparse.ArgumentParser(description='Train ML Regime Classifier')
-    parser.add_argument(
-        '--days',
-        type=int,
-        default=730,
-        help='Days of historical data to use (default: 730 = 2 years)'
-    )
-    parser.add_argument(
-        '--symbol',
-        type=str,
-        default='SPY',
-        help='Symbol to train on (default: SPY)'
-    )
-    parser.add_argument(
-        '--model-path',
-        type=str,
-        default='/opt/quantshift/models/regime_classifier.pkl',
-        help='Path to save trained model'
-    )
-    
-    args = parser.parse_args()
-    
-    logger.info("=" * 60)
-    logger.info("ML Regime Classifier Training")
-    logger.info("=" * 60)
-    
-    # Fetch data
-    data = fetch_training_data(args.symbol, args.days)
-    
+def train_symbol(symbol: str, data: pd.DataFrame, days: int, model_path: str) -> int:
+    """Train and save one classifier; returns a process exit code."""
     if data.empty:
-        logger.error("Failed to fetch training data")
+        logger.error(f"Failed to fetch training data for {symbol}")
         return 1
     
     # Initialize classifier
-    classifier = MLRegimeClassifier(model_path=args.model_path)
+    classifier = MLRegimeClassifier(model_path=model_path)
     
     # Train
-    logger.info("Starting training...")
-    results = classifier.train(data, lookback_days=args.days)
+    logger.info(f"Starting training on {symbol}...")
+    results = classifier.train(data, lookback_days=days)
     
     if not results.get('success'):
         logger.error(f"Training failed: {results.get('error')}")
@@ -91,7 +124,7 @@ def main():
     
     # Print results
     logger.info("=" * 60)
-    logger.info("Training Results")
+    logger.info(f"Training Results ({symbol})")
     logger.info("=" * 60)
     logger.info(f"Train Accuracy: {results['train_accuracy']:.3f}")
     logger.info(f"Test Accuracy: {results['test_accuracy']:.3f}")
@@ -110,12 +143,60 @@ def main():
     logger.info(results['classification_report'])
     
     logger.info("=" * 60)
-    logger.info(f"Model saved to: {args.model_path}")
-    logger.info("Training complete!")
+    logger.info(f"Model saved to: {model_path}")
     logger.info("=" * 60)
     
     return 0
 
 
+def main():
+    parser = argparse.ArgumentParser(description='Train ML Regime Classifier')
+    parser.add_argument(
+        '--days',
+        type=int,
+        default=730,
+        help='Days of historical data to use (default: 730 = 2 years)'
+    )
+    parser.add_argument(
+        '--symbol',
+        type=str,
+        nargs='+',
+        default=['SPY'],
+        help='Symbol(s) to train on (default: SPY); one model per symbol'
+    )
+    parser.add_argument(
+        '--cache-dir',
+        type=str,
+        default='/opt/quantshift/cache',
+        help='Directory for cached Parquet price history'
+    )
+    parser.add_argument(
+        '--model-path',
+        type=str,
+        default='/opt/quantshift/models/regime_classifier.pkl',
+        help='Path to save trained model'
+    )
+    
+    args = parser.parse_args()
+    
+    logger.info("=" * 60)
+    logger.info("ML Regime Classifier Training")
+    logger.info("=" * 60)
+    
+    # Fetch data for every symbol up front, in parallel
+    datasets = fetch_training_data_multi(
+        args.symbol, lambda symbol: fetch_training_data(symbol, args.days, args.cache_dir)
+    )
+    
+    status = 0
+    for symbol, data in datasets.items():
+        model_path = model_path_for(args.model_path, symbol, args.symbol)
+        status = train_symbol(symbol, data, args.days, model_path) or status
+    
+    if status == 0:
+        logger.info("Training complete!")
+    return status
+
+
 if __name__ == '__main__':
     sys.exit(main())
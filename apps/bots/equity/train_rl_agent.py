@@ -6,7 +6,7 @@ Trains a PPO agent to learn optimal position sizing from historical data.
 Supports daily online learning and weekly full retraining.
 
 Usage:
-    python train_rl_agent.py [--timesteps 100000] [--days 730]
+    python train_rl_agent.py [--timesteps 100000] [--days 730] [--symbol SPY [QQQ ...]]
 """
 
 import sys
@@ -17,6 +17,8 @@ sys.path.insert(0, '/opt/quantshift/packages/core/src')
 
 from quantshift_core.rl_position_sizer import RLPositionSizer
 from quantshift_core.rl_trading_env import prepare_training_data
+from training_utils import fetch_training_data_multi, model_path_for
+import pandas as pd
 import logging
 
 logging.basicConfig(
@@ -26,45 +28,10 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-def main():
-    parser = argparse.ArgumentParser(description='Train RL Position Sizing Agent')
-    parser.add_argument(
-        '--timesteps',
-        type=int,
-        default=100000,
-        help='Training timesteps (default: 100000)'
-    )
-    parser.add_argument(
-        '--days',
-        type=int,
-        default=730,
-        help='Days of historical data (default: 730 = 2 years)'
-    )
-    parser.add_argument(
-        '--symbol',
-        type=str,
-        default='SPY',
-        help='Symbol to train on (default: SPY)'
-    )
-    parser.add_argument(
-        '--model-path',
-        type=str,
-        default='/opt/quantshift/models/rl_position_sizer.zip',
-        help='Path to save trained model'
-    )
-    
-    args = parser.parse_args()
-    
-    logger.info("=" * 60)
-    logger.info("RL Position Sizing Agent Training")
-    logger.info("=" * 60)
-    
-    # Fetch training data
-    logger.info(f"Fetching {args.days} days of {args.symbol} data...")
-    data = prepare_training_data(symbol=args.symbol, days=args.days)
-    
+def train_symbol(symbol: str, data: pd.DataFrame, timesteps: int, model_path: str) -> int:
+    """Train and save one agent; returns a process exit code."""
     if data.empty:
-        logger.error("Failed to fetch training data")
+        logger.error(f"Failed to fetch training data for {symbol}")
         return 1
     
     logger.info(f"Training data: {len(data)} bars")
@@ -72,18 +39,18 @@ def main():
     # Initialize RL agent
     logger.info("Initializing RL agent...")
     agent = RLPositionSizer(
-        model_path=args.model_path,
+        model_path=model_path,
         retrain_interval_days=7,  # Weekly retraining
         online_learning=True  # Enable daily learning
     )
     
     # Train
-    logger.info(f"Training for {args.timesteps} timesteps...")
+    logger.info(f"Training for {timesteps} timesteps...")
     logger.info("This may take 5-10 minutes...")
     
     results = agent.train(
         training_data=data,
-        total_timesteps=args.timesteps,
+        total_timesteps=timesteps,
         save_model=True
     )
     
@@ -94,7 +61,7 @@ def main():
     # Print results
     metrics = results.get('metrics', {})
     logger.info("=" * 60)
-    logger.info("Training Results")
+    logger.info(f"Training Results ({symbol})")
     logger.info("=" * 60)
     logger.info(f"Total Return: {metrics.get('total_return', 0):.2%}")
     logger.info(f"Sharpe Ratio: {metrics.get('sharpe_ratio', 0):.2f}")
@@ -103,7 +70,7 @@ def main():
     logger.info(f"Total Trades: {metrics.get('num_trades', 0)}")
     logger.info(f"Final Equity: ${metrics.get('final_equity', 0):,.2f}")
     logger.info("")
-    logger.info(f"Model saved to: {args.model_path}")
+    logger.info(f"Model saved to: {model_path}")
     logger.info("=" * 60)
     logger.info("Training complete!")
     logger.info("=" * 60)
@@ -119,5 +86,53 @@ def main():
     return 0
 
 
+def main():
+    parser = argparse.ArgumentParser(description='Train RL Position Sizing Agent')
+    parser.add_argument(
+        '--timesteps',
+        type=int,
+        default=100000,
+        help='Training timesteps (default: 100000)'
+    )
+    parser.add_argument(
+        '--days',
+        type=int,
+        default=730,
+        help='Days of historical data (default: 730 = 2 years)'
+    )
+    parser.add_argument(
+        '--symbol',
+        type=str,
+        nargs='+',
+        default=['SPY'],
+        help='Symbol(s) to train on (default: SPY); one model per symbol'
+    )
+    parser.add_argument(
+        '--model-path',
+        type=str,
+        default='/opt/quantshift/models/rl_position_sizer.zip',
+        help='Path to save trained model'
+    )
+    
+    args = parser.parse_args()
+    
+    logger.info("=" * 60)
+    logger.info("RL Position Sizing Agent Training")
+    logger.info("=" * 60)
+    
+    # Fetch data for every symbol up front, in parallel
+    logger.info(f"Fetching {args.days} days of {', '.join(args.symbol)} data...")
+    datasets = fetch_training_data_multi(
+        args.symbol, lambda symbol: prepare_training_data(symbol=symbol, days=args.days)
+    )
+    
+    status = 0
+    for symbol, data in datasets.items():
+        model_path = model_path_for(args.model_path, symbol, args.symbol)
+        status = train_symbol(symbol, data, args.timesteps, model_path) or status
+    
+    return status
+
+
 if __name__ == '__main__':
     sys.exit(main())
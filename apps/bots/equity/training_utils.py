@@ -0,0 +1,24 @@
+"""
+Helpers shared by the model training scripts.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import pandas as pd
+
+
+def fetch_training_data_multi(symbols: List[str], fetch: Callable[[str], pd.DataFrame],
+                              max_workers: int = 8) -> Dict[str, pd.DataFrame]:
+    """Fetch several symbols concurrently; the downloads are HTTP-latency bound."""
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(symbols))) as pool:
+        return dict(zip(symbols, pool.map(fetch, symbols), strict=True))
+
+
+def model_path_for(model_path: str, symbol: str, symbols: List[str]) -> str:
+    """Keep the configured path for one symbol; suffix it per symbol otherwise."""
+    if len(symbols) == 1:
+        return model_path
+    path = Path(model_path)
+    return str(path.with_name(f"{path.stem}_{symbol}{path.suffix}"))
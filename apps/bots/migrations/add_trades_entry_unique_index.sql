@@ -0,0 +1,49 @@
+-- Migration: Add unique index on trades(bot_name, symbol, entered_at)
+-- Date: 2026-10-16
+-- Description: Lets the equity bot's order sync batch-insert with
+--              ON CONFLICT DO NOTHING instead of probing each order first
+
+-- The dedupe and the index build run as one transaction, so a failed index
+-- build also restores the deleted rows. Writers are held off until it
+-- commits, so no new duplicate can land between the DELETE and the index
+BEGIN;
+
+LOCK TABLE trades IN SHARE ROW EXCLUSIVE MODE;
+
+-- Rank copies of the same trade by age; the first-written row
+-- (earliest created_at, then id) is the original and is kept
+CREATE TEMP TABLE trades_duplicates ON COMMIT DROP AS
+SELECT id, bot_name
+FROM (
+    SELECT
+        id,
+        bot_name,
+        ROW_NUMBER() OVER (
+            PARTITION BY bot_name, symbol, entered_at
+            ORDER BY created_at, id
+        ) AS copy_number
+    FROM trades
+) ranked
+WHERE copy_number > 1;
+
+-- Report what is about to be removed, per bot
+SELECT bot_name, COUNT(*) AS duplicates_removed
+FROM trades_duplicates
+GROUP BY bot_name
+ORDER BY bot_name;
+
+-- Remove duplicates left by earlier syncs
+DELETE FROM trades
+WHERE id IN (SELECT id FROM trades_duplicates);
+
+-- Unique index used as the ON CONFLICT arbiter
+CREATE UNIQUE INDEX IF NOT EXISTS idx_trades_bot_symbol_entered_at
+ON trades(bot_name, symbol, entered_at);
+
+COMMIT;
+
+-- Verify migration
+SELECT indexname, indexdef
+FROM pg_indexes
+WHERE tablename = 'trades'
+    AND indexname = 'idx_trades_bot_symbol_entered_at';
@@ -22,6 +22,7 @@ Systemd service:
 import os
 import sys
 import time
+import logging
 import subprocess
 import psycopg2
 from datetime import datetime, timezone
@@ -33,7 +34,13 @@ structlog.configure(
         structlog.processors.TimeStamper(fmt="iso"),
         structlog.processors.add_log_level,
         structlog.processors.JSONRenderer()
-    ]
+    ],
+    # Drop events below LOG_LEVEL before any processor runs; the per-check
+    # heartbeat debug event fires every loop
+    wrapper_class=structlog.make_filtering_bound_logger(
+        logging.getLevelName(os.getenv('LOG_LEVEL', 'INFO').upper())
+    ),
+    cache_logger_on_first_use=True
 )
 
 logger = structlog.get_logger()
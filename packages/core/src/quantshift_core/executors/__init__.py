@@ -5,8 +5,22 @@ This module provides broker-specific executors that implement the same interface
 for executing broker-agnostic strategies across different trading platforms.
 """
 
-from .alpaca_executor import AlpacaExecutor
-from .coinbase_executor import CoinbaseExecutor
+import importlib
+
+# Each executor pulls in its broker SDK, so executors are imported on first
+# access; a crypto bot never loads the Alpaca SDK and vice versa
+_EXECUTOR_MODULES = {
+    'AlpacaExecutor': '.alpaca_executor',
+    'CoinbaseExecutor': '.coinbase_executor',
+}
+
+
+def __getattr__(name):
+    if name in _EXECUTOR_MODULES:
+        module = importlib.import_module(_EXECUTOR_MODULES[name], __name__)
+        return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __all__ = [
     'AlpacaExecutor',
@@ -9,7 +9,7 @@ import sys
 import time
 import logging
 from typing import List, Optional, Dict, Any
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import pandas as pd
 
 # Add core package to path
@@ -27,6 +27,10 @@ from quantshift_core.risk import PositionLimits
 
 logger = logging.getLogger(__name__)
 
+# Longest a cached market clock reading is trusted, even if the next scheduled
+# open/close is further away (covers unscheduled halts)
+_MARKET_CLOCK_MAX_AGE = timedelta(minutes=15)
+
 
 class AlpacaExecutor:
     """
@@ -89,6 +93,11 @@ class AlpacaExecutor:
         self._circuit_breaker_open = False
         self._last_reset_date = datetime.utcnow().date()
         
+        # Cached market clock: open/closed only changes at Alpaca's next_open /
+        # next_close, so the clock endpoint is not polled every cycle
+        self._market_open = False
+        self._market_open_until = None
+        
         symbol_info = "dynamic (lazy loading)" if use_dynamic_symbols else f"{len(self.symbols)} symbols"
         logger.info(
             f"AlpacaExecutor initialized with {strategy.name} strategy for {symbol_info}"
@@ -418,9 +427,19 @@ class AlpacaExecutor:
             return None
     
     def is_market_open(self) -> bool:
-        """Check if the US stock market is currently open via Alpaca clock API."""
+        """Check if the US stock market is currently open via Alpaca clock API.
+        
+        The answer is cached until the next scheduled open/close, capped at
+        _MARKET_CLOCK_MAX_AGE.
+        """
+        now = datetime.now(timezone.utc)
+        if self._market_open_until is not None and now < self._market_open_until:
+            return self._market_open
         try:
             clock = self.alpaca_client.get_clock()
+            next_change = clock.next_close if clock.is_open else clock.next_open
+            self._market_open = clock.is_open
+            self._market_open_until = min(next_change, now + _MARKET_CLOCK_MAX_AGE)
             return clock.is_open
         except Exception as e:
             logger.warning(f"Could not check market clock: {e} — assuming closed")
@@ -108,6 +108,16 @@ class CoinbaseExecutor:
                 f"Symbols refreshed: {old_count} -> {len(self.symbols)}"
             )
     
+    def _simulated_account(self) -> Account:
+        """Build the flat-cash account used when trading on simulated capital."""
+        return Account(
+            equity=self.simulated_capital,
+            cash=self.simulated_capital,
+            buying_power=self.simulated_capital,
+            portfolio_value=self.simulated_capital,
+            positions_count=0
+        )
+    
     def get_account(self) -> Account:
         """
         Fetch account information from Coinbase and convert to broker-agnostic format.
@@ -128,13 +138,7 @@ class CoinbaseExecutor:
                     "using_simulated_capital",
                     capital=self.simulated_capital
                 )
-                return Account(
-                    equity=self.simulated_capital,
-                    cash=self.simulated_capital,
-                    buying_power=self.simulated_capital,
-                    portfolio_value=self.simulated_capital,
-                    positions_count=0
-                )
+                return self._simulated_account()
             
             # Get all accounts from Coinbase (live trading mode)
             logger.info("fetching_real_coinbase_balance")
@@ -172,13 +176,7 @@ class CoinbaseExecutor:
             # Return simulated capital as fallback
             if self.simulated_capital:
                 logger.warning("Falling back to simulated capital due to API error")
-                return Account(
-                    equity=self.simulated_capital,
-                    cash=self.simulated_capital,
-                    buying_power=self.simulated_capital,
-                    portfolio_value=self.simulated_capital,
-                    positions_count=0
-                )
+                return self._simulated_account()
             raise
     
     def get_positions(self) -> List[Position]:
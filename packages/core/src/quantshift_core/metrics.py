@@ -128,6 +128,13 @@ class BotMetrics:
             ['component']
         )
         
+        # Failover metrics
+        self.primary_check_fallbacks = Counter(
+            f'{component_name}_primary_check_fallbacks_total',
+            'Total number of primary checks that fell back to the last known role',
+            ['component']
+        )
+        
         # Emergency stop metrics
         self.emergency_stops = Counter(
             f'{component_name}_emergency_stops_total',
@@ -261,6 +268,10 @@ class BotMetrics:
         """Record a watchdog restart."""
         self.watchdog_restarts.labels(component=self.component_name).inc()
     
+    def record_primary_check_fallback(self):
+        """Record a primary check that could not reach Redis."""
+        self.primary_check_fallbacks.labels(component=self.component_name).inc()
+    
     def record_emergency_stop(self):
         """Record an emergency stop event."""
         self.emergency_stops.labels(component=self.component_name).inc()
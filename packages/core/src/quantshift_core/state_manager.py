@@ -13,11 +13,46 @@ import structlog
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 
+# orjson decodes Redis payloads in C; writes stay on the stdlib encoder, which
+# also accepts the float subclasses (numpy scalars) that strategies produce
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _json_loads(data):
+    """Decode a Redis payload, with orjson when it is installed.
+
+    json.dumps writes NaN and Infinity as bare literals, which orjson rejects;
+    those payloads go through the stdlib decoder instead.
+    """
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(data)
+
 from quantshift_core.config import get_settings
 from quantshift_core.database import get_db
 
 logger = structlog.get_logger()
 
+# Acquire the primary lock, or refresh it if we already hold it, in one round
+# trip. KEYS[1] = lock key, ARGV[1] = instance ID, ARGV[2] = TTL in seconds.
+# Returns 1 when this instance is primary, 0 when another instance holds it.
+_PRIMARY_LOCK_SCRIPT = """
+if redis.call('SET', KEYS[1], ARGV[1], 'NX', 'EX', ARGV[2]) then
+    return 1
+end
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    redis.call('EXPIRE', KEYS[1], ARGV[2])
+    return 1
+end
+return 0
+"""
+
 
 class StateManager:
     """Manage bot state across Redis and PostgreSQL for failover."""
@@ -36,6 +71,7 @@ class StateManager:
             socket_connect_timeout=5,
             socket_timeout=5,
         )
+        self._primary_lock = self.redis_client.register_script(_PRIMARY_LOCK_SCRIPT)
         self.db = get_db()
         self._shutdown_handlers: list = []
         self._setup_signal_handlers()
@@ -98,7 +134,7 @@ class StateManager:
             key = f"bot:{self.bot_name}:state"
             data = self.redis_client.get(key)
             if data:
-                state = json.loads(data)
+                state = _json_loads(data)
                 logger.info("state_loaded", bot_name=self.bot_name)
                 return state
             return None
@@ -122,16 +158,37 @@ class StateManager:
             if "read only replica" not in str(e).lower():
                 logger.error("position_save_failed", symbol=symbol, error=str(e))
 
+    def save_positions_bulk(self, positions: Dict[str, Dict[str, Any]]) -> None:
+        """Save several positions to Redis in a single pipelined round trip."""
+        if not positions:
+            return
+        try:
+            now = datetime.utcnow().isoformat()
+            pipe = self.redis_client.pipeline(transaction=False)
+            for symbol, position_data in positions.items():
+                # Stamp a copy; callers may share these dicts with other writers
+                pipe.setex(
+                    f"bot:{self.bot_name}:position:{symbol}",
+                    86400,  # 24 hour TTL
+                    json.dumps({**position_data, "last_update": now}),
+                )
+            pipe.execute()
+            logger.debug("positions_saved", count=len(positions))
+        except Exception as e:
+            # Silently fail if Redis is read-only (standby server)
+            if "read only replica" not in str(e).lower():
+                logger.error("positions_save_failed", count=len(positions), error=str(e))
+
     def load_positions(self) -> Dict[str, Dict[str, Any]]:
         """Load all positions from Redis."""
         try:
             pattern = f"bot:{self.bot_name}:position:*"
+            keys = list(self.redis_client.scan_iter(match=pattern))
             positions = {}
-            for key in self.redis_client.scan_iter(match=pattern):
-                symbol = key.split(":")[-1]
-                data = self.redis_client.get(key)
+            # One MGET for every matched key instead of a GET per position
+            for key, data in zip(keys, self.redis_client.mget(keys) if keys else [], strict=True):
                 if data:
-                    positions[symbol] = json.loads(data)
+                    positions[key.split(":")[-1]] = _json_loads(data)
             logger.info("positions_loaded", count=len(positions))
             return positions
         except Exception as e:
@@ -147,6 +204,42 @@ class StateManager:
         except Exception as e:
             logger.error("position_clear_failed", symbol=symbol, error=str(e))
 
+    def clear_positions_bulk(self, symbols: List[str]) -> None:
+        """Clear several positions from Redis with a single DEL."""
+        if not symbols:
+            return
+        try:
+            self.redis_client.delete(
+                *(f"bot:{self.bot_name}:position:{symbol}" for symbol in symbols)
+            )
+            logger.debug("positions_cleared", count=len(symbols))
+        except Exception as e:
+            logger.error("positions_clear_failed", count=len(symbols), error=str(e))
+
+    def save_cursor(self, name: str, value: str) -> None:
+        """Save a sync cursor (e.g. last processed order time) to Redis.
+
+        Cursors have no TTL so incremental syncs resume where they left off
+        after a restart or failover.
+        """
+        try:
+            key = f"bot:{self.bot_name}:cursor:{name}"
+            self.redis_client.set(key, value)
+            logger.debug("cursor_saved", name=name, value=value)
+        except Exception as e:
+            # Silently fail if Redis is read-only (standby server)
+            if "read only replica" not in str(e).lower():
+                logger.error("cursor_save_failed", name=name, error=str(e))
+
+    def load_cursor(self, name: str) -> Optional[str]:
+        """Load a sync cursor from Redis."""
+        try:
+            key = f"bot:{self.bot_name}:cursor:{name}"
+            return self.redis_client.get(key)
+        except Exception as e:
+            logger.error("cursor_load_failed", name=name, error=str(e))
+            return None
+
     def heartbeat(self) -> None:
         """Send heartbeat to indicate bot is alive."""
         try:
@@ -157,33 +250,51 @@ class StateManager:
             if "read only replica" not in str(e).lower():
                 logger.error("redis_heartbeat_failed", error=str(e))
 
+    def save_state_and_heartbeat(self, state: Dict[str, Any]) -> None:
+        """Save bot state and refresh the heartbeat in one pipelined round trip."""
+        try:
+            now = datetime.utcnow().isoformat()
+            state["last_update"] = now
+            pipe = self.redis_client.pipeline(transaction=False)
+            pipe.setex(
+                f"bot:{self.bot_name}:state",
+                3600,  # 1 hour TTL
+                json.dumps(state),
+            )
+            pipe.setex(f"bot:{self.bot_name}:heartbeat", 60, now)
+            pipe.execute()
+            logger.debug("state_saved", bot_name=self.bot_name, heartbeat=True)
+        except Exception as e:
+            # Silently fail if Redis is read-only (standby server)
+            if "read only replica" not in str(e).lower():
+                logger.error("state_save_failed", error=str(e))
+
     def is_primary(self) -> bool:
         """Check if this bot instance should be primary.
         
         Uses Redis lock with instance ID to prevent split-brain.
         Primary refreshes lock every cycle. Standby waits for lock to expire.
         """
+        try:
+            return self.check_primary()
+        except Exception as e:
+            logger.error("primary_check_failed", error=str(e))
+            return True  # Default to primary if Redis fails for other reasons
+    
+    def check_primary(self) -> bool:
+        """Check primary role like is_primary(), but raise if Redis fails.
+        
+        Lets callers decide how to ride out a Redis outage instead of always
+        assuming primary. A read-only replica still reports standby.
+        """
         try:
             import socket
             instance_id = f"{socket.gethostname()}:{os.getpid()}"
             key = f"bot:{self.bot_name}:primary_lock"
             
-            # Try to acquire lock with our instance ID
-            acquired = self.redis_client.set(key, instance_id, nx=True, ex=30)
-            
-            if acquired:
-                # We acquired the lock - we are primary
-                return True
-            
-            # Lock exists - check if it's ours
-            current_holder = self.redis_client.get(key)
-            if current_holder == instance_id:
-                # We already hold the lock - refresh it
-                self.redis_client.expire(key, 30)
-                return True
-            
-            # Another instance holds the lock - we are standby
-            return False
+            # Acquire the lock, or refresh it if it is already ours; another
+            # holder means we are standby
+            return self._primary_lock(keys=[key], args=[instance_id, 30]) == 1
             
         except Exception as e:
             error_msg = str(e)
@@ -191,9 +302,7 @@ class StateManager:
             if "read only replica" in error_msg.lower() or "readonly" in error_msg.lower():
                 logger.debug("redis_readonly_standby", bot_name=self.bot_name)
                 return False
-            
-            logger.error("primary_check_failed", error=error_msg)
-            return True  # Default to primary if Redis fails for other reasons
+            raise
     
     @contextmanager
     def atomic_transaction(self):
@@ -5,7 +5,10 @@ Broker-agnostic trading strategies that can be used with any broker (Alpaca, Coi
 and for backtesting.
 """
 
-from .base_strategy import BaseStrategy, Signal, SignalType, Account, Position
+from .base_strategy import (
+    BaseStrategy, Signal, SignalType, Account, Position,
+    STRATEGY_REGISTRY, register_strategy
+)
 from .ma_crossover import MACrossoverStrategy
 from .bollinger_bounce import BollingerBounce
 from .rsi_mean_reversion import RSIMeanReversion
@@ -20,6 +23,8 @@ __all__ = [
     'SignalType',
     'Account',
     'Position',
+    'STRATEGY_REGISTRY',
+    'register_strategy',
     'MACrossoverStrategy',
     'BollingerBounce',
     'RSIMeanReversion',
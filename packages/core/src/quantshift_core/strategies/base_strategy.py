@@ -15,6 +15,18 @@ import structlog
 
 logger = structlog.get_logger()
 
+# Strategy classes keyed by the ``type`` name used in bot configs; populated by
+# @register_strategy when each strategy module is imported
+STRATEGY_REGISTRY: Dict[str, type] = {}
+
+
+def register_strategy(name: Optional[str] = None):
+    """Class decorator registering a strategy under ``name`` (default: class name)."""
+    def decorator(cls):
+        STRATEGY_REGISTRY[name or cls.__name__] = cls
+        return cls
+    return decorator
+
 
 class SignalType(Enum):
     """Trading signal types."""
@@ -63,6 +75,8 @@ class Account:
     positions_count: int = 0
     margin_used: float = 0.0  # For margin trading
     maintenance_margin: float = 0.0  # For margin trading
+    realized_pl: float = 0.0
+    unrealized_pl: Optional[float] = None  # None when the broker doesn't report it
     
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -72,7 +86,9 @@ class Account:
             'portfolio_value': self.portfolio_value,
             'positions_count': self.positions_count,
             'margin_used': self.margin_used,
-            'maintenance_margin': self.maintenance_margin
+            'maintenance_margin': self.maintenance_margin,
+            'realized_pl': self.realized_pl,
+            'unrealized_pl': self.unrealized_pl
         }
 
 
@@ -20,12 +20,13 @@ import numpy as np
 import structlog
 
 from .base_strategy import (
-    BaseStrategy, Signal, SignalType, Account, Position
+    BaseStrategy, Signal, SignalType, Account, Position, register_strategy
 )
 
 logger = structlog.get_logger()
 
 
+@register_strategy()
 class BollingerBounce(BaseStrategy):
     """
     Bollinger Band Bounce mean reversion strategy.
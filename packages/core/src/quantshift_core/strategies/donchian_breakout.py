@@ -25,12 +25,13 @@ import numpy as np
 import structlog
 
 from .base_strategy import (
-    BaseStrategy, Signal, SignalType, Account, Position
+    BaseStrategy, Signal, SignalType, Account, Position, register_strategy
 )
 
 logger = structlog.get_logger()
 
 
+@register_strategy()
 class DonchianBreakoutStrategy(BaseStrategy):
     """
     Donchian Channel breakout strategy (Turtle Trading).
@@ -5,7 +5,7 @@ Manages multiple trading strategies simultaneously with capital allocation,
 conflict resolution, performance tracking, and market regime adaptation.
 """
 
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, TYPE_CHECKING
 from datetime import datetime
 import pandas as pd
 import structlog
@@ -13,9 +13,12 @@ import structlog
 from .strategies.base_strategy import BaseStrategy, Signal, SignalType, Account, Position
 from .market_regime import MarketRegimeDetector, MarketRegime
 from .risk_manager import RiskManager, CircuitBreakerStatus
-from .ml_regime_classifier import MLRegimeClassifier
 from .sentiment_analyzer import SentimentAnalyzer
 
+if TYPE_CHECKING:
+    # Pulls in scikit-learn; only imported at runtime when use_ml_regime is set
+    from .ml_regime_classifier import MLRegimeClassifier
+
 logger = structlog.get_logger()
 
 
@@ -40,7 +43,7 @@ class StrategyOrchestrator:
         use_regime_detection: bool = False,
         regime_detector: Optional[MarketRegimeDetector] = None,
         use_ml_regime: bool = False,
-        ml_regime_classifier: Optional[MLRegimeClassifier] = None,
+        ml_regime_classifier: Optional['MLRegimeClassifier'] = None,
         use_risk_management: bool = True,
         risk_manager: Optional[RiskManager] = None,
         use_sentiment_analysis: bool = False,
@@ -82,7 +85,10 @@ class StrategyOrchestrator:
         if use_regime_detection:
             if use_ml_regime:
                 # Use ML-based regime classifier
-                self.ml_regime_classifier = ml_regime_classifier or MLRegimeClassifier()
+                if ml_regime_classifier is None:
+                    from .ml_regime_classifier import MLRegimeClassifier
+                    ml_regime_classifier = MLRegimeClassifier()
+                self.ml_regime_classifier = ml_regime_classifier
                 self.regime_detector = None
                 self.logger.info("Using ML-based regime classifier")
             else:
@@ -5,13 +5,120 @@ Updates strategy_performance table with metrics after each trade.
 Calculates win rate, P&L, Sharpe ratio, profit factor, and drawdown per strategy.
 """
 
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Iterable, List, Optional, Tuple
 from datetime import datetime
 import psycopg2
+from psycopg2.extras import execute_values
 import structlog
 
 logger = structlog.get_logger()
 
+# Running statistics kept per strategy, in the column order used by the
+# batched UPDATE/INSERT below
+_STAT_COLUMNS = (
+    'total_trades', 'winning_trades', 'losing_trades', 'win_rate',
+    'total_pnl', 'total_pnl_pct',
+    'avg_win', 'avg_loss', 'largest_win', 'largest_loss',
+    'profit_factor', 'max_drawdown', 'current_drawdown', 'peak_equity',
+)
+
+# Casts keep all-NULL columns (e.g. avg_loss before any losing trade) from
+# being typed as text inside the VALUES list
+_STAT_TEMPLATE = '%s::int, %s::int, %s::int, ' + ', '.join(['%s::float8'] * 11)
+
+_UPDATE_PERFORMANCE_SQL = f"""
+    UPDATE strategy_performance AS sp SET
+        {', '.join(f'{col} = v.{col}' for col in _STAT_COLUMNS)},
+        last_trade_at = NOW(),
+        updated_at = NOW()
+    FROM (VALUES %s) AS v(bot_name, strategy_name, {', '.join(_STAT_COLUMNS)})
+    WHERE sp.bot_name = v.bot_name AND sp.strategy_name = v.strategy_name
+"""
+
+_INSERT_PERFORMANCE_SQL = f"""
+    INSERT INTO strategy_performance (
+        id, bot_name, strategy_name,
+        {', '.join(_STAT_COLUMNS)},
+        last_trade_at, created_at, updated_at
+    ) VALUES %s
+"""
+
+
+def _first_trade_stats(trade_pnl: float, trade_pnl_pct: float, is_win: bool) -> Dict[str, Any]:
+    """Statistics for a strategy whose first trade just closed."""
+    peak_equity = trade_pnl if trade_pnl > 0 else 0
+    current_drawdown = 0 if trade_pnl >= 0 else abs(trade_pnl / peak_equity * 100) if peak_equity > 0 else 0
+    return {
+        'total_trades': 1,
+        'winning_trades': 1 if is_win else 0,
+        'losing_trades': 0 if is_win else 1,
+        'win_rate': 100.0 if is_win else 0.0,
+        'total_pnl': trade_pnl,
+        'total_pnl_pct': trade_pnl_pct,
+        'avg_win': trade_pnl if is_win else None,
+        'avg_loss': abs(trade_pnl) if not is_win else None,
+        'largest_win': trade_pnl if is_win else None,
+        'largest_loss': abs(trade_pnl) if not is_win else None,
+        'profit_factor': None,
+        'max_drawdown': current_drawdown,
+        'current_drawdown': current_drawdown,
+        'peak_equity': peak_equity,
+    }
+
+
+def _apply_trade(stats: Dict[str, Any], trade_pnl: float, trade_pnl_pct: float, is_win: bool) -> None:
+    """Fold one closed trade into a strategy's existing statistics."""
+    stats['total_trades'] += 1
+    stats['total_pnl'] += trade_pnl
+    stats['total_pnl_pct'] += trade_pnl_pct
+    
+    if is_win:
+        stats['winning_trades'] += 1
+        # Update avg_win
+        if stats['avg_win'] is None:
+            stats['avg_win'] = trade_pnl
+        else:
+            winning_trades = stats['winning_trades']
+            stats['avg_win'] = ((stats['avg_win'] * (winning_trades - 1)) + trade_pnl) / winning_trades
+        # Update largest_win
+        if stats['largest_win'] is None or trade_pnl > stats['largest_win']:
+            stats['largest_win'] = trade_pnl
+    else:
+        stats['losing_trades'] += 1
+        # Update avg_loss
+        if stats['avg_loss'] is None:
+            stats['avg_loss'] = abs(trade_pnl)
+        else:
+            losing_trades = stats['losing_trades']
+            stats['avg_loss'] = ((stats['avg_loss'] * (losing_trades - 1)) + abs(trade_pnl)) / losing_trades
+        # Update largest_loss
+        if stats['largest_loss'] is None or abs(trade_pnl) > stats['largest_loss']:
+            stats['largest_loss'] = abs(trade_pnl)
+    
+    # Calculate win rate
+    total_trades = stats['total_trades']
+    winning_trades = stats['winning_trades']
+    losing_trades = stats['losing_trades']
+    stats['win_rate'] = (winning_trades / total_trades * 100) if total_trades > 0 else 0
+    
+    # Calculate profit factor
+    avg_win, avg_loss = stats['avg_win'], stats['avg_loss']
+    total_wins = avg_win * winning_trades if avg_win and winning_trades > 0 else 0
+    total_losses = avg_loss * losing_trades if avg_loss and losing_trades > 0 else 0
+    stats['profit_factor'] = (total_wins / total_losses) if total_losses > 0 else None
+    
+    # Update peak equity and calculate drawdown
+    peak_equity = stats['peak_equity']
+    if stats['total_pnl'] > peak_equity:
+        stats['peak_equity'] = stats['total_pnl']
+        current_drawdown = 0
+    else:
+        current_drawdown = ((peak_equity - stats['total_pnl']) / peak_equity * 100) if peak_equity > 0 else 0
+    stats['current_drawdown'] = current_drawdown
+    
+    if current_drawdown > (stats['max_drawdown'] or 0):
+        stats['max_drawdown'] = current_drawdown
+
 
 class StrategyPerformanceTracker:
     """Tracks and updates per-strategy performance metrics."""
@@ -43,159 +150,82 @@ class StrategyPerformanceTracker:
             trade_pnl_pct: Trade P&L as percentage
             is_win: Whether the trade was profitable
         """
+        self.batch_update(bot_name, [(strategy_name, trade_pnl, trade_pnl_pct, is_win)])
+    
+    def batch_update(
+        self,
+        bot_name: str,
+        trades: Iterable[Tuple[str, float, float, bool]]
+    ) -> None:
+        """
+        Update strategy performance metrics after several trades close.
+        
+        Trades are folded in order exactly as repeated calls to
+        update_strategy_performance would, but with one SELECT, at most one
+        UPDATE and one INSERT, and a single commit.
+        
+        Args:
+            bot_name: Name of the bot
+            trades: (strategy_name, trade_pnl, trade_pnl_pct, is_win) tuples
+        """
+        trades = list(trades)
+        if not trades:
+            return
+        
         try:
             cursor = self.db_conn.cursor()
             
-            # Get current strategy performance or create new record
-            cursor.execute("""
-                SELECT 
-                    total_trades, winning_trades, losing_trades,
-                    total_pnl, total_pnl_pct, peak_equity,
-                    avg_win, avg_loss, largest_win, largest_loss
+            # Get current performance for every strategy touched by the batch
+            cursor.execute(f"""
+                SELECT strategy_name, {', '.join(_STAT_COLUMNS)}
                 FROM strategy_performance
-                WHERE bot_name = %s AND strategy_name = %s
-            """, (bot_name, strategy_name))
+                WHERE bot_name = %s AND strategy_name = ANY(%s)
+            """, (bot_name, list({trade[0] for trade in trades})))
             
-            result = cursor.fetchone()
+            existing: Dict[str, Dict[str, Any]] = {
+                row[0]: dict(zip(_STAT_COLUMNS, row[1:], strict=True)) for row in cursor.fetchall()
+            }
+            created: Dict[str, Dict[str, Any]] = {}
+            applied: List[Tuple[str, float, bool, int, float]] = []
             
-            if result:
-                # Update existing record
-                (total_trades, winning_trades, losing_trades,
-                 total_pnl, total_pnl_pct, peak_equity,
-                 avg_win, avg_loss, largest_win, largest_loss) = result
-                
-                total_trades += 1
-                total_pnl += trade_pnl
-                total_pnl_pct += trade_pnl_pct
-                
-                if is_win:
-                    winning_trades += 1
-                    # Update avg_win
-                    if avg_win is None:
-                        avg_win = trade_pnl
-                    else:
-                        avg_win = ((avg_win * (winning_trades - 1)) + trade_pnl) / winning_trades
-                    # Update largest_win
-                    if largest_win is None or trade_pnl > largest_win:
-                        largest_win = trade_pnl
-                else:
-                    losing_trades += 1
-                    # Update avg_loss
-                    if avg_loss is None:
-                        avg_loss = abs(trade_pnl)
-                    else:
-                        avg_loss = ((avg_loss * (losing_trades - 1)) + abs(trade_pnl)) / losing_trades
-                    # Update largest_loss
-                    if largest_loss is None or abs(trade_pnl) > largest_loss:
-                        largest_loss = abs(trade_pnl)
-                
-                # Calculate win rate
-                win_rate = (winning_trades / total_trades * 100) if total_trades > 0 else 0
-                
-                # Calculate profit factor
-                total_wins = avg_win * winning_trades if avg_win and winning_trades > 0 else 0
-                total_losses = avg_loss * losing_trades if avg_loss and losing_trades > 0 else 0
-                profit_factor = (total_wins / total_losses) if total_losses > 0 else None
-                
-                # Update peak equity and calculate drawdown
-                if total_pnl > peak_equity:
-                    peak_equity = total_pnl
-                    current_drawdown = 0
+            for strategy_name, trade_pnl, trade_pnl_pct, is_win in trades:
+                stats = existing.get(strategy_name) or created.get(strategy_name)
+                if stats is None:
+                    stats = created[strategy_name] = _first_trade_stats(trade_pnl, trade_pnl_pct, is_win)
                 else:
-                    current_drawdown = ((peak_equity - total_pnl) / peak_equity * 100) if peak_equity > 0 else 0
-                
-                # Get max drawdown
-                cursor.execute("""
-                    SELECT max_drawdown FROM strategy_performance
-                    WHERE bot_name = %s AND strategy_name = %s
-                """, (bot_name, strategy_name))
-                max_dd_result = cursor.fetchone()
-                max_drawdown = max_dd_result[0] if max_dd_result else 0
-                
-                if current_drawdown > (max_drawdown or 0):
-                    max_drawdown = current_drawdown
-                
-                # Update the record
-                cursor.execute("""
-                    UPDATE strategy_performance SET
-                        total_trades = %s,
-                        winning_trades = %s,
-                        losing_trades = %s,
-                        win_rate = %s,
-                        total_pnl = %s,
-                        total_pnl_pct = %s,
-                        avg_win = %s,
-                        avg_loss = %s,
-                        largest_win = %s,
-                        largest_loss = %s,
-                        profit_factor = %s,
-                        max_drawdown = %s,
-                        current_drawdown = %s,
-                        peak_equity = %s,
-                        last_trade_at = NOW(),
-                        updated_at = NOW()
-                    WHERE bot_name = %s AND strategy_name = %s
-                """, (
-                    total_trades, winning_trades, losing_trades, win_rate,
-                    total_pnl, total_pnl_pct,
-                    avg_win, avg_loss, largest_win, largest_loss,
-                    profit_factor, max_drawdown, current_drawdown, peak_equity,
-                    bot_name, strategy_name
-                ))
-            else:
-                # Create new record
-                win_rate = 100.0 if is_win else 0.0
-                winning_trades = 1 if is_win else 0
-                losing_trades = 0 if is_win else 1
-                avg_win = trade_pnl if is_win else None
-                avg_loss = abs(trade_pnl) if not is_win else None
-                largest_win = trade_pnl if is_win else None
-                largest_loss = abs(trade_pnl) if not is_win else None
-                profit_factor = None
-                peak_equity = trade_pnl if trade_pnl > 0 else 0
-                current_drawdown = 0 if trade_pnl >= 0 else abs(trade_pnl / peak_equity * 100) if peak_equity > 0 else 0
-                max_drawdown = current_drawdown
-                
-                cursor.execute("""
-                    INSERT INTO strategy_performance (
-                        id, bot_name, strategy_name,
-                        total_trades, winning_trades, losing_trades, win_rate,
-                        total_pnl, total_pnl_pct,
-                        avg_win, avg_loss, largest_win, largest_loss,
-                        profit_factor, max_drawdown, current_drawdown, peak_equity,
-                        last_trade_at, created_at, updated_at
-                    ) VALUES (
-                        gen_random_uuid(), %s, %s,
-                        %s, %s, %s, %s,
-                        %s, %s,
-                        %s, %s, %s, %s,
-                        %s, %s, %s, %s,
-                        NOW(), NOW(), NOW()
-                    )
-                """, (
-                    bot_name, strategy_name,
-                    1, winning_trades, losing_trades, win_rate,
-                    trade_pnl, trade_pnl_pct,
-                    avg_win, avg_loss, largest_win, largest_loss,
-                    profit_factor, max_drawdown, current_drawdown, peak_equity
-                ))
+                    _apply_trade(stats, trade_pnl, trade_pnl_pct, is_win)
+                applied.append((strategy_name, trade_pnl, is_win, stats['total_trades'], stats['win_rate']))
+            
+            if existing:
+                execute_values(
+                    cursor, _UPDATE_PERFORMANCE_SQL,
+                    [(bot_name, name, *(stats[col] for col in _STAT_COLUMNS)) for name, stats in existing.items()],
+                    template=f"(%s, %s, {_STAT_TEMPLATE})"
+                )
+            if created:
+                execute_values(
+                    cursor, _INSERT_PERFORMANCE_SQL,
+                    [(bot_name, name, *(stats[col] for col in _STAT_COLUMNS)) for name, stats in created.items()],
+                    template=f"(gen_random_uuid(), %s, %s, {_STAT_TEMPLATE}, NOW(), NOW(), NOW())"
+                )
             
             self.db_conn.commit()
             
-            logger.info(
-                "strategy_performance_updated",
-                bot_name=bot_name,
-                strategy=strategy_name,
-                trade_pnl=trade_pnl,
-                is_win=is_win,
-                total_trades=total_trades if result else 1,
-                win_rate=win_rate
-            )
+            for strategy_name, trade_pnl, is_win, total_trades, win_rate in applied:
+                logger.info(
+                    "strategy_performance_updated",
+                    bot_name=bot_name,
+                    strategy=strategy_name,
+                    trade_pnl=trade_pnl,
+                    is_win=is_win,
+                    total_trades=total_trades,
+                    win_rate=win_rate
+                )
             
         except Exception as e:
             logger.error("strategy_performance_update_failed", error=str(e), exc_info=True)
             if self.db_conn:
                 try:
                     self.db_conn.rollback()
-                except:
+                except psycopg2.Error:
                     pass
@@ -1,5 +1,8 @@
 """Tests for StateManager class."""
 
+import json
+import math
+
 import pytest
 from unittest.mock import Mock, patch
 from quantshift_core.state_manager import StateManager
@@ -44,6 +47,114 @@ def test_save_and_load_position():
         assert mock_client.setex.called
 
 
+def test_save_positions_bulk():
+    """Test bulk position saves share one pipeline round trip."""
+    with patch('quantshift_core.state_manager.redis.from_url') as mock_redis:
+        mock_client = Mock()
+        mock_pipe = Mock()
+        mock_client.pipeline.return_value = mock_pipe
+        mock_redis.return_value = mock_client
+
+        state = StateManager(bot_name="test-bot")
+        state.save_positions_bulk({
+            "AAPL": {"quantity": 10, "entry_price": 150.00},
+            "MSFT": {"quantity": 5, "entry_price": 300.00},
+        })
+
+        mock_client.pipeline.assert_called_once_with(transaction=False)
+        assert mock_pipe.setex.call_count == 2
+        mock_pipe.execute.assert_called_once()
+        assert not mock_client.setex.called
+
+
+def test_load_positions_uses_mget():
+    """Test loading positions fetches every key in one MGET."""
+    with patch('quantshift_core.state_manager.redis.from_url') as mock_redis:
+        mock_client = Mock()
+        mock_client.scan_iter.return_value = iter([
+            "bot:test-bot:position:AAPL", "bot:test-bot:position:MSFT"
+        ])
+        mock_client.mget.return_value = ['{"quantity": 10}', None]
+        mock_redis.return_value = mock_client
+
+        state = StateManager(bot_name="test-bot")
+
+        assert state.load_positions() == {"AAPL": {"quantity": 10}}
+        mock_client.mget.assert_called_once()
+        assert not mock_client.get.called
+
+
+def test_load_positions_accepts_nan():
+    """Test positions written with NaN (json.dumps default) still load."""
+    with patch('quantshift_core.state_manager.redis.from_url') as mock_redis:
+        mock_client = Mock()
+        mock_client.scan_iter.return_value = iter([
+            "bot:test-bot:position:AAPL", "bot:test-bot:position:MSFT"
+        ])
+        mock_client.mget.return_value = [
+            json.dumps({"quantity": 10, "unrealized_pl": float("nan")}),
+            '{"quantity": 5}'
+        ]
+        mock_redis.return_value = mock_client
+
+        state = StateManager(bot_name="test-bot")
+        positions = state.load_positions()
+
+        assert positions["MSFT"] == {"quantity": 5}
+        assert positions["AAPL"]["quantity"] == 10
+        assert math.isnan(positions["AAPL"]["unrealized_pl"])
+
+
+def test_clear_positions_bulk():
+    """Test bulk position clears share one DEL command."""
+    with patch('quantshift_core.state_manager.redis.from_url') as mock_redis:
+        mock_client = Mock()
+        mock_redis.return_value = mock_client
+
+        state = StateManager(bot_name="test-bot")
+        state.clear_positions_bulk(["AAPL", "MSFT"])
+
+        mock_client.delete.assert_called_once_with(
+            "bot:test-bot:position:AAPL", "bot:test-bot:position:MSFT"
+        )
+
+
+def test_save_state_and_heartbeat():
+    """Test state and heartbeat writes share one pipeline round trip."""
+    with patch('quantshift_core.state_manager.redis.from_url') as mock_redis:
+        mock_client = Mock()
+        mock_pipe = Mock()
+        mock_client.pipeline.return_value = mock_pipe
+        mock_redis.return_value = mock_client
+
+        state = StateManager(bot_name="test-bot")
+        state.save_state_and_heartbeat({"strategy": "test", "value": 123})
+
+        keys = [call.args[0] for call in mock_pipe.setex.call_args_list]
+        assert keys == ["bot:test-bot:state", "bot:test-bot:heartbeat"]
+        mock_pipe.execute.assert_called_once()
+        assert not mock_client.setex.called
+
+
+def test_save_and_load_cursor():
+    """Test saving and loading sync cursors."""
+    with patch('quantshift_core.state_manager.redis.from_url') as mock_redis:
+        mock_client = Mock()
+        mock_client.get.return_value = "2026-01-02T03:04:05+00:00"
+        mock_redis.return_value = mock_client
+
+        state = StateManager(bot_name="test-bot")
+
+        # Cursors are stored without a TTL
+        state.save_cursor("orders", "2026-01-02T03:04:05+00:00")
+        mock_client.set.assert_called_once_with(
+            "bot:test-bot:cursor:orders", "2026-01-02T03:04:05+00:00"
+        )
+
+        assert state.load_cursor("orders") == "2026-01-02T03:04:05+00:00"
+        mock_client.get.assert_called_with("bot:test-bot:cursor:orders")
+
+
 def test_heartbeat():
     """Test heartbeat functionality."""
     with patch('quantshift_core.state_manager.redis.from_url') as mock_redis:
@@ -57,5 +168,40 @@ def test_heartbeat():
         assert mock_client.setex.called
 
 
+
+def test_check_primary_uses_lock_script():
+    """Test the primary lock is acquired or refreshed in one script call."""
+    with patch('quantshift_core.state_manager.redis.from_url') as mock_redis:
+        mock_client = Mock()
+        mock_script = Mock(return_value=1)
+        mock_client.register_script.return_value = mock_script
+        mock_redis.return_value = mock_client
+
+        state = StateManager(bot_name="test-bot")
+
+        assert state.check_primary() is True
+        mock_script.assert_called_once()
+        assert mock_script.call_args.kwargs["keys"] == ["bot:test-bot:primary_lock"]
+
+        mock_script.return_value = 0
+        assert state.check_primary() is False
+
+
+def test_check_primary_raises_on_redis_error():
+    """Test check_primary surfaces Redis failures that is_primary swallows."""
+    with patch('quantshift_core.state_manager.redis.from_url') as mock_redis:
+        mock_client = Mock()
+        mock_client.register_script.return_value = Mock(
+            side_effect=ConnectionError("connection refused")
+        )
+        mock_redis.return_value = mock_client
+
+        state = StateManager(bot_name="test-bot")
+
+        with pytest.raises(ConnectionError):
+            state.check_primary()
+        assert state.is_primary() is True
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])